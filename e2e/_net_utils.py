@@ -0,0 +1,90 @@
+"""Networking helpers shared by the e2e conftest modules."""
+
+import collections
+import socket
+import subprocess
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class PortPool:
+    """Loopback ports reserved up front, handed out one at a time.
+
+    Each port stays bound by a socket until it is taken, so nothing else can
+    claim it in between; the socket is closed just before the port is
+    returned for a child process to listen on.
+    """
+
+    def __init__(self, size: int = 16) -> None:
+        self._socks: collections.deque[socket.socket] = collections.deque()
+        for _ in range(size):
+            s = socket.socket()
+            s.bind(("127.0.0.1", 0))
+            self._socks.append(s)
+
+    def take(self) -> int:
+        if not self._socks:
+            return free_port()
+        s = self._socks.popleft()
+        port = s.getsockname()[1]
+        s.close()
+        return port
+
+    def close(self) -> None:
+        while self._socks:
+            self._socks.popleft().close()
+
+
+def wait_for_http(
+    url: str,
+    timeout: float = 10.0,
+    client: httpx.Client | None = None,
+    proc: subprocess.Popen | None = None,
+) -> None:
+    # Probe with a bare TCP connect until the server is listening, then
+    # poll the route until it answers without a 5xx. If the server's
+    # process is given, fail as soon as it exits instead of at the deadline.
+    def _check_alive() -> None:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"Server for {url} exited with code {proc.returncode} before it started")
+
+    parts = urlsplit(url)
+    address = (parts.hostname, parts.port)
+    deadline = time.monotonic() + timeout
+    delay = 0.001
+    while True:
+        try:
+            with socket.create_connection(address, timeout=0.2):
+                break
+        except OSError:
+            _check_alive()
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Server at {url} did not start in {timeout}s")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+    get = client.get if client is not None else httpx.get
+    while True:
+        try:
+            resp = get(url, timeout=2.0)
+            if resp.status_code < 500:
+                return
+        except httpx.ReadTimeout:
+            # Server accepted the connection and sent headers but the
+            # response body is streaming (e.g. SSE).  That means the
+            # server is up — treat this as success.
+            return
+        except (httpx.ConnectError, httpx.RemoteProtocolError):
+            # Listening but not serving yet, or the child went away.
+            _check_alive()
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Server at {url} did not start in {timeout}s")
+        time.sleep(delay)
+        delay = min(delay * 2, 0.05)
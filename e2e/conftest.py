@@ -1,54 +1,79 @@
+import collections
 import os
-import socket
 import subprocess
 import threading
-import time
+from concurrent.futures import Future
 from pathlib import Path
 
 import httpx
 import pytest
 import uvicorn
 
+from _net_utils import PortPool, wait_for_http as _wait_for_http
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 TOOLSCRIPT_BINARY = PROJECT_ROOT / "target" / "release" / "toolscript"
 
+# Startup work kicked off in pytest_configure and awaited by the fixtures.
+_BUILD_KEY = pytest.StashKey[Future]()
+_TEST_API_KEY = pytest.StashKey[Future]()
+_PORT_POOL_KEY = pytest.StashKey[PortPool]()
 
-def _free_port() -> int:
-    with socket.socket() as s:
-        s.bind(("127.0.0.1", 0))
-        return s.getsockname()[1]
+# Per-test wall time (setup + call + teardown) from previous runs, keyed by
+# node id; used to start the slowest files first.
+_DURATIONS_CACHE_KEY = "toolscript-e2e/durations"
+_durations: collections.defaultdict[str, float] = collections.defaultdict(float)
 
 
-def _wait_for_http(url: str, timeout: float = 10.0) -> None:
-    deadline = time.monotonic() + timeout
-    while time.monotonic() < deadline:
-        try:
-            resp = httpx.get(url, timeout=2.0)
-            if resp.status_code < 500:
-                return
-        except httpx.ConnectError:
-            pass
-        time.sleep(0.1)
-    raise TimeoutError(f"Server at {url} did not start in {timeout}s")
+def _binary_is_stale() -> bool:
+    # Compare mtimes ourselves: even a no-op `cargo build` costs far more
+    # than a handful of stat calls.
+    try:
+        built_at = TOOLSCRIPT_BINARY.stat().st_mtime
+    except FileNotFoundError:
+        return True
+    sources = [
+        PROJECT_ROOT / "Cargo.toml",
+        PROJECT_ROOT / "Cargo.lock",
+        *PROJECT_ROOT.glob("src/**/*.rs"),
+    ]
+    return any(p.stat().st_mtime > built_at for p in sources if p.exists())
 
 
-@pytest.fixture(scope="session")
-def toolscript_binary() -> Path:
+def _build_binary() -> Path:
     # When an external server is provided, the binary is not needed.
     if os.environ.get("TOOL_SCRIPT_URL"):
         return TOOLSCRIPT_BINARY
-    if not TOOLSCRIPT_BINARY.exists():
+    if _binary_is_stale():
+        # Captured so cargo's progress does not interleave with pytest's
+        # output; attached to the error by the toolscript_binary fixture.
         subprocess.run(
             ["cargo", "build", "--release"],
             cwd=PROJECT_ROOT,
             check=True,
+            capture_output=True,
+            text=True,
         )
     return TOOLSCRIPT_BINARY
 
 
-@pytest.fixture(scope="session")
-def test_api_url() -> str:
-    port = _free_port()
+def _run_in_background(fn, *args) -> Future:
+    # A daemon thread rather than an executor: executor threads are joined
+    # at interpreter exit, so an early failure would still wait on cargo.
+    future: Future = Future()
+
+    def _run() -> None:
+        try:
+            future.set_result(fn(*args))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=_run, name=f"e2e-startup-{fn.__name__}", daemon=True).start()
+    return future
+
+
+def _start_test_api(port_pool: PortPool) -> tuple[uvicorn.Server, threading.Thread, str, httpx.Client]:
+    port = port_pool.take()
     url = f"http://127.0.0.1:{port}"
     # Set the server URL env var so the OpenAPI spec includes it
     # in the servers section (must be set before first /openapi.json request).
@@ -58,21 +83,138 @@ def test_api_url() -> str:
         host="127.0.0.1",
         port=port,
         log_level="warning",
+        # loop="auto" already prefers uvloop when it is installed. uvicorn
+        # >= 0.36 builds it through a loop factory; older releases set a
+        # process-wide uvloop policy from this thread instead.
+        http="h11",
+        access_log=False,
+        lifespan="off",
     )
     server = uvicorn.Server(config)
     thread = threading.Thread(target=server.run, daemon=True)
     thread.start()
-    _wait_for_http(f"{url}/openapi.json")
-    yield url
+    # Keep-alive client reused for every later request to the test API.
+    client = httpx.Client(base_url=url, timeout=5.0)
+    _wait_for_http(f"{url}/openapi.json", client=client)
+    return server, thread, url, client
+
+
+def _is_xdist_controller(config: pytest.Config) -> bool:
+    # The controller of a `pytest -n` run only schedules tests; each worker
+    # runs its own pytest_configure and starts its own test_api.
+    return not hasattr(config, "workerinput") and bool(getattr(config.option, "tx", None))
+
+
+# Optional so runs without pytest-xdist (or with -p no:xdist) don't reject
+# it as an unknown hook.
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_auto_num_workers(config: pytest.Config) -> int:
+    # Leave two cores for the toolscript and mock servers the workers spawn.
+    return max(1, (os.cpu_count() or 1) - 2)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    # Overlap the (CPU-bound) cargo build with the test_api startup so the
+    # first fixture only waits for whichever finishes last.
+    option = config.option
+    if option.collectonly or option.help or option.showfixtures or option.markers:
+        return
+    if _is_xdist_controller(config):
+        return
+    port_pool = config.stash[_PORT_POOL_KEY] = PortPool()
+    config.stash[_BUILD_KEY] = _run_in_background(_build_binary)
+    config.stash[_TEST_API_KEY] = _run_in_background(_start_test_api, port_pool)
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    port_pool = config.stash.get(_PORT_POOL_KEY, None)
+    if port_pool is not None:
+        port_pool.close()
+    future = config.stash.get(_TEST_API_KEY, None)
+    if future is None or future.exception() is not None:
+        return
+    server, thread, _, client = future.result()
+    client.close()
     server.should_exit = True
     thread.join(timeout=5)
 
 
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    # Reorder whole files, slowest first by their cached total, keeping each
+    # file's tests together so module fixtures are set up once and
+    # --dist=loadfile hands the longest files out first.
+    cache = getattr(config, "cache", None)
+    if cache is None:
+        return
+    cached = cache.get(_DURATIONS_CACHE_KEY, {})
+    if not cached:
+        return
+    file_totals: collections.defaultdict[str, float] = collections.defaultdict(float)
+    for item in items:
+        file_totals[item.path] += cached.get(item.nodeid, 0.0)
+    items.sort(key=lambda item: file_totals[item.path], reverse=True)
+
+
+def pytest_runtest_logreport(report: pytest.TestReport) -> None:
+    # Under xdist the controller receives every worker's reports as well.
+    _durations[report.nodeid] += report.duration
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    config = session.config
+    cache = getattr(config, "cache", None)
+    # Only the controller writes, so workers never race on the cache file.
+    if cache is None or hasattr(config, "workerinput") or not _durations:
+        return
+    # Files that ran are replaced wholesale so renamed or removed tests drop
+    # out; the rest keep their timings for as long as the file exists.
+    ran_files = {nodeid.split("::", 1)[0] for nodeid in _durations}
+    cached = {
+        nodeid: d
+        for nodeid, d in cache.get(_DURATIONS_CACHE_KEY, {}).items()
+        if (path := nodeid.split("::", 1)[0]) not in ran_files
+        and (config.rootpath / path).exists()
+    }
+    cached.update({nodeid: round(d, 3) for nodeid, d in _durations.items()})
+    cache.set(_DURATIONS_CACHE_KEY, cached)
+
+
+@pytest.fixture(scope="session")
+def port_pool(pytestconfig: pytest.Config) -> PortPool:
+    return pytestconfig.stash[_PORT_POOL_KEY]
+
+
+@pytest.fixture(scope="session")
+def toolscript_binary(pytestconfig: pytest.Config) -> Path:
+    try:
+        return pytestconfig.stash[_BUILD_KEY].result()
+    except subprocess.CalledProcessError as exc:
+        exc.add_note(f"cargo output:\n{exc.stdout}{exc.stderr}")
+        raise
+
+
+@pytest.fixture(scope="session")
+def test_api_url(pytestconfig: pytest.Config) -> str:
+    _, _, url, _ = pytestconfig.stash[_TEST_API_KEY].result()
+    return url
+
+
 @pytest.fixture(scope="session")
 def openapi_spec_url(test_api_url: str) -> str:
     return f"{test_api_url}/openapi.json"
 
 
+@pytest.fixture(scope="session")
+def http_client(pytestconfig: pytest.Config) -> httpx.Client:
+    """Keep-alive client based at the test API (absolute URLs work too)."""
+    _, _, _, client = pytestconfig.stash[_TEST_API_KEY].result()
+    return client
+
+
 @pytest.fixture(autouse=True)
-def reset_test_data(test_api_url: str) -> None:
-    httpx.post(f"{test_api_url}/reset", timeout=5.0)
+def reset_test_data(request: pytest.FixtureRequest, http_client: httpx.Client):
+    # Every test starts from seeded data: tests that may mutate it reset
+    # afterwards, tests marked readonly skip the round-trip entirely.
+    yield
+    if request.node.get_closest_marker("readonly") is None:
+        http_client.post("/reset")
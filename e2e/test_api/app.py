@@ -1,7 +1,8 @@
 import os
+import threading
 from typing import Any
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.openapi.utils import get_openapi
 
 from test_api.auth import require_auth
@@ -63,16 +64,64 @@ db_pets: dict[int, Pet] = seed_pets()
 db_owners: dict[int, Owner] = seed_owners()
 next_pet_id: int = 5
 
+# Set by every mutating endpoint so /reset can skip re-seeding clean state.
+dirty: bool = False
+_dirty_lock = threading.Lock()
+
+
+def _mark_dirty() -> None:
+    global dirty
+    with _dirty_lock:
+        dirty = True
+
 
 @app.post("/reset", tags=["admin"], operation_id="reset_data")
 def reset_data() -> dict[str, str]:
-    global db_pets, db_owners, next_pet_id
-    db_pets = seed_pets()
-    db_owners = seed_owners()
-    next_pet_id = 5
+    global db_pets, db_owners, next_pet_id, dirty
+    with _dirty_lock:
+        if dirty:
+            db_pets = seed_pets()
+            db_owners = seed_owners()
+            next_pet_id = 5
+            dirty = False
     return {"status": "ok"}
 
 
+class StaticJSON:
+    """Raw ASGI endpoint that answers every request with one pre-rendered body.
+
+    Skips FastAPI's request parsing and response construction entirely; the
+    body and headers are rendered once, whenever the body changes.
+    """
+
+    def __init__(self, body: bytes) -> None:
+        self.set(body)
+
+    def set(self, body: bytes) -> None:
+        self.body = body
+        self.headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": 200, "headers": self.headers})
+        await send({"type": "http.response.body", "body": self.body})
+
+
+# JWKS document for the HTTP transport's JWT auth tests, installed by the
+# jwks_server fixture. Kept out of the OpenAPI spec so it never becomes an SDK
+# function.
+jwks = StaticJSON(b'{"keys": []}')
+app.add_route("/jwks", jwks, methods=["GET"], include_in_schema=False)
+
+
+@app.post("/set-jwks", include_in_schema=False)
+async def set_jwks(request: Request) -> Response:
+    jwks.set(await request.body())
+    return Response(status_code=204)
+
+
 @app.get("/pets", tags=["pets"], operation_id="list_pets")
 def list_pets(
     limit: int | None = None,
@@ -90,6 +139,7 @@ def list_pets(
 @app.post("/pets", tags=["pets"], status_code=201, dependencies=[Depends(require_auth)], operation_id="create_pet")
 def create_pet(body: PetCreate) -> Pet:
     global next_pet_id
+    _mark_dirty()
     pet = Pet(id=next_pet_id, **body.model_dump())
     db_pets[next_pet_id] = pet
     next_pet_id += 1
@@ -107,6 +157,7 @@ def get_pet(pet_id: int) -> Pet:
 def update_pet(pet_id: int, body: PetUpdate) -> Pet:
     if pet_id not in db_pets:
         raise HTTPException(status_code=404, detail="Pet not found")
+    _mark_dirty()
     existing = db_pets[pet_id]
     updated = existing.model_copy(update=body.model_dump(exclude_unset=True))
     db_pets[pet_id] = updated
@@ -117,6 +168,7 @@ def update_pet(pet_id: int, body: PetUpdate) -> Pet:
 def delete_pet(pet_id: int) -> dict[str, str]:
     if pet_id not in db_pets:
         raise HTTPException(status_code=404, detail="Pet not found")
+    _mark_dirty()
     del db_pets[pet_id]
     return {"status": "deleted"}
 
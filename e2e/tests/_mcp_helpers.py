@@ -0,0 +1,55 @@
+"""MCP client session management shared by the e2e fixtures."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncContextManager, AsyncIterator
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+
+@asynccontextmanager
+async def managed_session(transport: AsyncContextManager) -> AsyncIterator[ClientSession]:
+    """Open an MCP client session over ``transport`` and yield it.
+
+    pytest-asyncio runs fixture setup and teardown in different tasks, but
+    the anyio cancel scopes inside the transport and ClientSession must be
+    entered and exited by the same task. A background task therefore owns
+    both context managers and blocks until the caller exits.
+    """
+    loop = asyncio.get_running_loop()
+    session_ready: asyncio.Future[ClientSession] = loop.create_future()
+    shutdown_event = asyncio.Event()
+
+    async def _run():
+        try:
+            async with transport as streams:
+                read, write = streams[0], streams[1]
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    session_ready.set_result(session)
+                    # Block until the caller signals shutdown
+                    await shutdown_event.wait()
+        except Exception as exc:
+            if not session_ready.done():
+                session_ready.set_exception(exc)
+
+    task = loop.create_task(_run())
+    try:
+        yield await session_ready
+    finally:
+        shutdown_event.set()
+        # Give the task a moment to clean up gracefully
+        try:
+            await asyncio.wait_for(task, timeout=5.0)
+        except (asyncio.TimeoutError, Exception):
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+
+def managed_stdio_session(server_params: StdioServerParameters) -> AsyncContextManager[ClientSession]:
+    """Spawn the server described by ``server_params`` and connect over stdio."""
+    return managed_session(stdio_client(server_params))
@@ -1,50 +1,22 @@
-import asyncio
 import base64
-import json
+import functools
 import os
-import socket
 import subprocess
 import time
-from contextlib import AsyncExitStack
-from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
-import threading
 
 import httpx
 import jwt
+import orjson
 import pytest
 import pytest_asyncio
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+from mcp import StdioServerParameters
 
-
-# Duplicated from parent conftest.py (module-level functions are not
-# inherited across conftest boundaries).
-def _free_port() -> int:
-    with socket.socket() as s:
-        s.bind(("127.0.0.1", 0))
-        return s.getsockname()[1]
-
-
-def _wait_for_http(url: str, timeout: float = 10.0) -> None:
-    deadline = time.monotonic() + timeout
-    while time.monotonic() < deadline:
-        try:
-            resp = httpx.get(url, timeout=2.0)
-            if resp.status_code < 500:
-                return
-        except httpx.ReadTimeout:
-            # Server accepted the connection and sent headers but the
-            # response body is streaming (e.g. SSE).  That means the
-            # server is up — treat this as success.
-            return
-        except httpx.ConnectError:
-            pass
-        time.sleep(0.1)
-    raise TimeoutError(f"Server at {url} did not start in {timeout}s")
+from _mcp_helpers import managed_session, managed_stdio_session
+from _net_utils import PortPool, wait_for_http as _wait_for_http
 
 
 # ---------------------------------------------------------------------------
@@ -52,64 +24,84 @@ def _wait_for_http(url: str, timeout: float = 10.0) -> None:
 # ---------------------------------------------------------------------------
 
 
+# Checked-in, test-only signing key. Override with E2E_TEST_KEY_PEM.
+TEST_KEY_PEM = Path(__file__).resolve().parent.parent / "fixtures" / "test_key.pem"
+
+_CACHED_KEY: rsa.RSAPrivateKey | None = None
+
+
+def _load_private_key() -> rsa.RSAPrivateKey:
+    """Load the test RSA key from disk.
+
+    A key is generated only when the default checked-in PEM is missing; an
+    explicit E2E_TEST_KEY_PEM must point at an existing file.
+    """
+    global _CACHED_KEY
+    if _CACHED_KEY is None:
+        override = os.environ.get("E2E_TEST_KEY_PEM")
+        pem_path = Path(override) if override else TEST_KEY_PEM
+        if override and not pem_path.exists():
+            raise FileNotFoundError(f"E2E_TEST_KEY_PEM points at a missing file: {pem_path}")
+        if pem_path.exists():
+            _CACHED_KEY = serialization.load_pem_private_key(
+                pem_path.read_bytes(), password=None, backend=default_backend()
+            )
+        else:
+            _CACHED_KEY = rsa.generate_private_key(
+                public_exponent=65537, key_size=2048, backend=default_backend()
+            )
+    return _CACHED_KEY
+
+
 @pytest.fixture(scope="session")
 def jwt_keys():
-    """Generate an RSA key pair for signing and verifying JWTs."""
-    private_key = rsa.generate_private_key(
-        public_exponent=65537, key_size=2048, backend=default_backend()
-    )
+    """RSA key pair for signing and verifying JWTs."""
+    private_key = _load_private_key()
     return private_key, private_key.public_key()
 
 
-@pytest.fixture(scope="session")
-def jwks_server(jwt_keys):
-    """Run a minimal HTTP server that serves a JWKS document."""
-    _, public_key = jwt_keys
-    pub_numbers = public_key.public_numbers()
+def _int_to_b64(n: int, length: int) -> str:
+    return base64.urlsafe_b64encode(n.to_bytes(length, "big")).rstrip(b"=").decode()
 
-    def _int_to_b64(n, length):
-        return base64.urlsafe_b64encode(n.to_bytes(length, "big")).rstrip(b"=").decode()
 
-    jwks_json = json.dumps({"keys": [{
+@functools.lru_cache(maxsize=4)
+def _jwks_bytes(n: int, e: int) -> bytes:
+    """Encoded JWKS document for the RSA public key with modulus n, exponent e."""
+    return orjson.dumps({"keys": [{
         "kty": "RSA", "use": "sig", "kid": "test-key-1", "alg": "RS256",
-        "n": _int_to_b64(pub_numbers.n, 256),
-        "e": _int_to_b64(pub_numbers.e, 3),
+        "n": _int_to_b64(n, 256),
+        "e": _int_to_b64(e, 3),
     }]})
 
-    class Handler(BaseHTTPRequestHandler):
-        def do_GET(self):
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(jwks_json.encode())
-
-        def log_message(self, *a):
-            pass
 
-    port = _free_port()
-    server = HTTPServer(("127.0.0.1", port), Handler)
-    thread = threading.Thread(target=server.serve_forever, daemon=True)
-    thread.start()
-    yield f"http://127.0.0.1:{port}"
-    server.shutdown()
+@pytest.fixture(scope="session")
+def jwks_server(jwt_keys, test_api_url: str, http_client: httpx.Client) -> str:
+    """Publish the JWKS document on the test API and return its base URL."""
+    _, public_key = jwt_keys
+    pub_numbers = public_key.public_numbers()
+    jwks_json = _jwks_bytes(pub_numbers.n, pub_numbers.e)
+    http_client.post("/set-jwks", content=jwks_json).raise_for_status()
+    return test_api_url
 
 
 @pytest.fixture(scope="session")
 def sign_jwt(jwt_keys):
     """Return a callable that signs JWTs with the test RSA key."""
+    # PyJWT accepts the key object directly, so no PEM round-trip per token.
     private_key, _ = jwt_keys
-    pem = private_key.private_bytes(
-        encoding=serialization.Encoding.PEM,
-        format=serialization.PrivateFormat.PKCS8,
-        encryption_algorithm=serialization.NoEncryption(),
-    )
 
+    # Tokens are cached per argument tuple; the default token stays valid
+    # for an hour, far longer than a test session.
+    @functools.lru_cache(maxsize=16)
     def _sign(audience="test-audience", issuer="test-issuer", exp_seconds=3600):
         now = int(time.time())
         return jwt.encode(
             {"sub": "test-user", "aud": audience, "iss": issuer, "iat": now, "exp": now + exp_seconds},
-            pem, algorithm="RS256", headers={"kid": "test-key-1"},
+            private_key, algorithm="RS256", headers={"kid": "test-key-1"},
         )
+
+    # Pre-sign the default token so the first sign_jwt() call is a lookup.
+    _sign()
     return _sign
 
 
@@ -118,121 +110,126 @@ def sign_jwt(jwt_keys):
 # ---------------------------------------------------------------------------
 
 
+# toolscript HTTP servers shared by every fixture that asks for the same CLI
+# args and env (the env carries upstream credentials); terminated in
+# pytest_sessionfinish.
+_TOOLSCRIPT_PROCS: dict[
+    tuple[tuple[str, ...], tuple[tuple[str, str], ...]], tuple[subprocess.Popen, str]
+] = {}
+
+
+def _get_or_spawn(
+    args: tuple[str, ...], env: dict[str, str], http_client: httpx.Client, port_pool: PortPool
+) -> tuple[subprocess.Popen, str]:
+    """Return the toolscript HTTP server for ``args`` and ``env``, spawning it on first use."""
+    key = (args, tuple(sorted(env.items())))
+    entry = _TOOLSCRIPT_PROCS.get(key)
+    if entry is not None and entry[0].poll() is None:
+        return entry
+    port = port_pool.take()
+    proc = subprocess.Popen(
+        [*args, "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    _TOOLSCRIPT_PROCS[key] = (proc, base_url)
+    _wait_for_http(
+        f"{base_url}/.well-known/oauth-protected-resource", client=http_client, proc=proc
+    )
+    return proc, base_url
+
+
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+    procs = [proc for proc, _ in _TOOLSCRIPT_PROCS.values()]
+    _TOOLSCRIPT_PROCS.clear()
+    for proc in procs:
+        proc.terminate()
+    # One shared deadline: the shutdown windows overlap instead of adding up.
+    deadline = time.monotonic() + 5
+    for proc in procs:
+        try:
+            proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def _http_server_url(toolscript_binary, openapi_spec_url, jwks_server, http_client, port_pool) -> str:
+    """Base URL of the shared toolscript HTTP transport server with JWT auth."""
+    env = {
+        "PATH": "/usr/bin:/bin",
+        "TEST_API_BEARER_TOKEN": "test-secret-123",
+    }
+    args = (
+        str(toolscript_binary), "run", openapi_spec_url,
+        "--auth", "TEST_API_BEARER_TOKEN",
+        "--transport", "http",
+        "--auth-authority", "test-issuer",
+        "--auth-audience", "test-audience",
+        "--auth-jwks-uri", f"{jwks_server}/jwks",
+    )
+    _, base_url = _get_or_spawn(args, env, http_client, port_pool)
+    return base_url
+
+
 @pytest_asyncio.fixture(loop_scope="session", scope="session")
-async def mcp_http_session(toolscript_binary, openapi_spec_url, jwks_server, sign_jwt):
-    """Spawn toolscript with HTTP transport + JWT auth, connect an MCP client.
+async def mcp_http_session(
+    toolscript_binary, openapi_spec_url, jwks_server, sign_jwt, http_client, port_pool
+):
+    """Connect an MCP client to toolscript over HTTP transport + JWT auth.
 
     If TOOL_SCRIPT_URL is set, connect to the external server instead.
     """
     from mcp.client.streamable_http import streamable_http_client
 
-    external_url = os.environ.get("TOOL_SCRIPT_URL")
-    if external_url:
-        base_url = external_url
-        proc = None
-    else:
-        port = _free_port()
-        env = {
-            "PATH": "/usr/bin:/bin",
-            "TEST_API_BEARER_TOKEN": "test-secret-123",
-        }
-        proc = subprocess.Popen(
-            [
-                str(toolscript_binary), "run", openapi_spec_url,
-                "--auth", "TEST_API_BEARER_TOKEN",
-                "--transport", "http", "--port", str(port),
-                "--auth-authority", "test-issuer",
-                "--auth-audience", "test-audience",
-                "--auth-jwks-uri", f"{jwks_server}/jwks",
-            ],
-            env=env,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-        base_url = f"http://127.0.0.1:{port}"
-        _wait_for_http(f"{base_url}/.well-known/oauth-protected-resource")
+    base_url = os.environ.get("TOOL_SCRIPT_URL") or _http_server_url(
+        toolscript_binary, openapi_spec_url, jwks_server, http_client, port_pool
+    )
 
     token = sign_jwt()
     headers = {"Authorization": f"Bearer {token}"}
 
-    session_ready = asyncio.get_event_loop().create_future()
-    shutdown_event = asyncio.Event()
-
-    async def _run():
-        try:
-            async with streamable_http_client(
-                f"{base_url}/mcp",
-                http_client=httpx.AsyncClient(headers=headers),
-            ) as (read, write, _):
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    session_ready.set_result(session)
-                    await shutdown_event.wait()
-        except Exception as exc:
-            if not session_ready.done():
-                session_ready.set_exception(exc)
-
-    task = asyncio.create_task(_run())
-    session = await session_ready
-    yield session
-    shutdown_event.set()
-    try:
-        await asyncio.wait_for(task, timeout=5.0)
-    except (asyncio.TimeoutError, Exception):
-        task.cancel()
-        try:
-            await task
-        except (asyncio.CancelledError, Exception):
-            pass
-    if proc is not None:
-        proc.terminate()
-        proc.wait(timeout=5)
+    transport = streamable_http_client(
+        f"{base_url}/mcp",
+        http_client=httpx.AsyncClient(headers=headers),
+    )
+    async with managed_session(transport) as session:
+        yield session
 
 
 @pytest.fixture(scope="session")
-def mcp_http_url(toolscript_binary, openapi_spec_url, jwks_server):
-    """Spawn toolscript with HTTP transport + JWT auth, yield the base URL.
+def mcp_http_url(toolscript_binary, openapi_spec_url, jwks_server, http_client, port_pool) -> str:
+    """Base URL of toolscript running with HTTP transport + JWT auth.
 
     If TOOL_SCRIPT_URL is set, skip spawning and use the external server.
     """
-    external_url = os.environ.get("TOOL_SCRIPT_URL")
-    if external_url:
-        yield external_url
-        return
+    return os.environ.get("TOOL_SCRIPT_URL") or _http_server_url(
+        toolscript_binary, openapi_spec_url, jwks_server, http_client, port_pool
+    )
 
-    port = _free_port()
-    env = {
-        "PATH": "/usr/bin:/bin",
-        "TEST_API_BEARER_TOKEN": "test-secret-123",
-    }
-    proc = subprocess.Popen(
-        [
-            str(toolscript_binary), "run", openapi_spec_url,
-            "--auth", "TEST_API_BEARER_TOKEN",
-            "--transport", "http", "--port", str(port),
-            "--auth-authority", "test-issuer",
-            "--auth-audience", "test-audience",
-            "--auth-jwks-uri", f"{jwks_server}/jwks",
-        ],
-        env=env,
+
+@pytest.fixture(scope="session")
+def generated_spec_dir(toolscript_binary: Path, openapi_spec_url: str, tmp_path_factory) -> Path:
+    """Output of ``toolscript generate`` for the test API spec.
+
+    The stdio fixtures ``serve`` this directory, so the spec is fetched,
+    parsed and turned into a manifest once per session rather than once per
+    process. The HTTP server keeps going through ``run``.
+    """
+    out_dir = tmp_path_factory.mktemp("toolscript-generated")
+    subprocess.run(
+        [str(toolscript_binary), "generate", openapi_spec_url, "--output", str(out_dir)],
+        check=True,
         stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
     )
-    url = f"http://127.0.0.1:{port}"
-    _wait_for_http(f"{url}/.well-known/oauth-protected-resource")
-    yield url
-    proc.terminate()
-    proc.wait(timeout=5)
+    return out_dir
 
 
 @pytest_asyncio.fixture(loop_scope="session", scope="session")
-async def mcp_stdio_session(toolscript_binary: Path, openapi_spec_url: str):
-    """Spawn toolscript and connect an MCP client over stdio.
-
-    Uses a background task to manage the stdio_client + ClientSession
-    context managers so that setup and teardown both run in the same
-    task, avoiding anyio cancel-scope cross-task errors.
-    """
+async def mcp_stdio_session(toolscript_binary: Path, generated_spec_dir: Path):
+    """Spawn toolscript and connect an MCP client over stdio."""
     env = {
         "PATH": "/usr/bin:/bin",
         "TEST_API_BEARER_TOKEN": "test-secret-123",
@@ -240,79 +237,28 @@ async def mcp_stdio_session(toolscript_binary: Path, openapi_spec_url: str):
     }
     server_params = StdioServerParameters(
         command=str(toolscript_binary),
-        args=["run", openapi_spec_url, "--auth", "TEST_API_BEARER_TOKEN"],
+        args=["serve", str(generated_spec_dir), "--auth", "TEST_API_BEARER_TOKEN"],
         env=env,
     )
-
-    session_ready: asyncio.Future[ClientSession] = asyncio.get_event_loop().create_future()
-    shutdown_event = asyncio.Event()
-
-    async def _run_session():
-        try:
-            async with stdio_client(server_params) as (read, write):
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    session_ready.set_result(session)
-                    # Block until tests signal shutdown
-                    await shutdown_event.wait()
-        except Exception as exc:
-            if not session_ready.done():
-                session_ready.set_exception(exc)
-
-    task = asyncio.create_task(_run_session())
-    session = await session_ready
-    yield session
-    shutdown_event.set()
-    # Give the task a moment to clean up gracefully
-    try:
-        await asyncio.wait_for(task, timeout=5.0)
-    except (asyncio.TimeoutError, Exception):
-        task.cancel()
-        try:
-            await task
-        except (asyncio.CancelledError, Exception):
-            pass
+    async with managed_stdio_session(server_params) as session:
+        yield session
 
 
-@pytest_asyncio.fixture(loop_scope="session")
-async def mcp_no_auth_session(toolscript_binary: Path, openapi_spec_url: str):
+@pytest_asyncio.fixture(loop_scope="session", scope="session")
+async def mcp_no_auth_session(toolscript_binary: Path, generated_spec_dir: Path):
     """toolscript instance with NO upstream API credentials."""
     env = {"PATH": "/usr/bin:/bin"}
     server_params = StdioServerParameters(
         command=str(toolscript_binary),
-        args=["run", openapi_spec_url],
+        args=["serve", str(generated_spec_dir)],
         env=env,
     )
-    session_ready = asyncio.get_event_loop().create_future()
-    shutdown_event = asyncio.Event()
-
-    async def _run():
-        try:
-            async with stdio_client(server_params) as (read, write):
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    session_ready.set_result(session)
-                    await shutdown_event.wait()
-        except Exception as exc:
-            if not session_ready.done():
-                session_ready.set_exception(exc)
-
-    task = asyncio.create_task(_run())
-    session = await session_ready
-    yield session
-    shutdown_event.set()
-    try:
-        await asyncio.wait_for(task, timeout=5.0)
-    except (asyncio.TimeoutError, Exception):
-        task.cancel()
-        try:
-            await task
-        except (asyncio.CancelledError, Exception):
-            pass
+    async with managed_stdio_session(server_params) as session:
+        yield session
 
 
 @pytest_asyncio.fixture(loop_scope="session", scope="session")
-async def mcp_io_session(toolscript_binary: Path, openapi_spec_url: str, tmp_path_factory):
+async def mcp_io_session(toolscript_binary: Path, generated_spec_dir: Path, tmp_path_factory):
     """toolscript instance with sandboxed io enabled."""
     io_dir = tmp_path_factory.mktemp("toolscript-io")
     env = {
@@ -322,38 +268,14 @@ async def mcp_io_session(toolscript_binary: Path, openapi_spec_url: str, tmp_pat
     server_params = StdioServerParameters(
         command=str(toolscript_binary),
         args=[
-            "run", openapi_spec_url,
+            "serve", str(generated_spec_dir),
             "--auth", "TEST_API_BEARER_TOKEN",
             "--io-dir", str(io_dir),
         ],
         env=env,
     )
-    session_ready = asyncio.get_event_loop().create_future()
-    shutdown_event = asyncio.Event()
-
-    async def _run():
-        try:
-            async with stdio_client(server_params) as (read, write):
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    session_ready.set_result((session, io_dir))
-                    await shutdown_event.wait()
-        except Exception as exc:
-            if not session_ready.done():
-                session_ready.set_exception(exc)
-
-    task = asyncio.create_task(_run())
-    session, out_dir = await session_ready
-    yield session, out_dir
-    shutdown_event.set()
-    try:
-        await asyncio.wait_for(task, timeout=5.0)
-    except (asyncio.TimeoutError, Exception):
-        task.cancel()
-        try:
-            await task
-        except (asyncio.CancelledError, Exception):
-            pass
+    async with managed_stdio_session(server_params) as session:
+        yield session, io_dir
 
 
 @pytest.fixture(scope="session")
@@ -371,37 +293,13 @@ async def mcp_only_session(toolscript_binary: Path, mock_mcp_server_path: Path):
         args=["run", "--mcp", f"mock=python {mock_mcp_server_path}"],
         env=env,
     )
-    session_ready: asyncio.Future[ClientSession] = asyncio.get_event_loop().create_future()
-    shutdown_event = asyncio.Event()
-
-    async def _run():
-        try:
-            async with stdio_client(server_params) as (read, write):
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    session_ready.set_result(session)
-                    await shutdown_event.wait()
-        except Exception as exc:
-            if not session_ready.done():
-                session_ready.set_exception(exc)
-
-    task = asyncio.create_task(_run())
-    session = await session_ready
-    yield session
-    shutdown_event.set()
-    try:
-        await asyncio.wait_for(task, timeout=5.0)
-    except (asyncio.TimeoutError, Exception):
-        task.cancel()
-        try:
-            await task
-        except (asyncio.CancelledError, Exception):
-            pass
+    async with managed_stdio_session(server_params) as session:
+        yield session
 
 
 @pytest_asyncio.fixture(loop_scope="session", scope="session")
 async def mcp_mixed_session(
-    toolscript_binary: Path, openapi_spec_url: str, mock_mcp_server_path: Path
+    toolscript_binary: Path, generated_spec_dir: Path, mock_mcp_server_path: Path
 ):
     """Spawn toolscript with both an OpenAPI spec and an MCP server, connect over stdio."""
     env = {
@@ -412,42 +310,18 @@ async def mcp_mixed_session(
     server_params = StdioServerParameters(
         command=str(toolscript_binary),
         args=[
-            "run", openapi_spec_url,
+            "serve", str(generated_spec_dir),
             "--auth", "TEST_API_BEARER_TOKEN",
             "--mcp", f"mock=python {mock_mcp_server_path}",
         ],
         env=env,
     )
-    session_ready: asyncio.Future[ClientSession] = asyncio.get_event_loop().create_future()
-    shutdown_event = asyncio.Event()
-
-    async def _run():
-        try:
-            async with stdio_client(server_params) as (read, write):
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    session_ready.set_result(session)
-                    await shutdown_event.wait()
-        except Exception as exc:
-            if not session_ready.done():
-                session_ready.set_exception(exc)
-
-    task = asyncio.create_task(_run())
-    session = await session_ready
-    yield session
-    shutdown_event.set()
-    try:
-        await asyncio.wait_for(task, timeout=5.0)
-    except (asyncio.TimeoutError, Exception):
-        task.cancel()
-        try:
-            await task
-        except (asyncio.CancelledError, Exception):
-            pass
+    async with managed_stdio_session(server_params) as session:
+        yield session
 
 
 @pytest_asyncio.fixture(loop_scope="session", scope="session")
-async def mcp_limited_session(toolscript_binary: Path, openapi_spec_url: str):
+async def mcp_limited_session(toolscript_binary: Path, generated_spec_dir: Path):
     """toolscript instance with short execution limits."""
     env = {
         "PATH": "/usr/bin:/bin",
@@ -456,36 +330,12 @@ async def mcp_limited_session(toolscript_binary: Path, openapi_spec_url: str):
     server_params = StdioServerParameters(
         command=str(toolscript_binary),
         args=[
-            "run", openapi_spec_url,
+            "serve", str(generated_spec_dir),
             "--auth", "TEST_API_BEARER_TOKEN",
             "--timeout", "2",
             "--max-api-calls", "3",
         ],
         env=env,
     )
-    session_ready = asyncio.get_event_loop().create_future()
-    shutdown_event = asyncio.Event()
-
-    async def _run():
-        try:
-            async with stdio_client(server_params) as (read, write):
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    session_ready.set_result(session)
-                    await shutdown_event.wait()
-        except Exception as exc:
-            if not session_ready.done():
-                session_ready.set_exception(exc)
-
-    task = asyncio.create_task(_run())
-    session = await session_ready
-    yield session
-    shutdown_event.set()
-    try:
-        await asyncio.wait_for(task, timeout=5.0)
-    except (asyncio.TimeoutError, Exception):
-        task.cancel()
-        try:
-            await task
-        except (asyncio.CancelledError, Exception):
-            pass
+    async with managed_stdio_session(server_params) as session:
+        yield session
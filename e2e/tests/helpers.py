@@ -1,14 +1,45 @@
 """Shared test helpers for e2e tests."""
 
-import json
-
+import orjson
 from mcp import ClientSession
 
 
+def parse_result(result) -> dict | list:
+    """Parse the JSON body of a successful tool call.
+
+    Discovery tools such as list_apis, list_functions and search_docs return
+    a JSON array; execute_script returns the envelope with 'result', 'logs',
+    and 'files_touched'. Raises AssertionError if the response indicates an
+    error.
+    """
+    text = result.content[0].text
+    assert not result.isError, f"Tool call error: {text}"
+    return orjson.loads(text)
+
+
 async def exec_script(session: ClientSession, script: str):
     """Call execute_script and return the parsed JSON response."""
     result = await session.call_tool("execute_script", {"script": script})
-    return json.loads(result.content[0].text)
+    return parse_result(result)
+
+
+async def exec_batch(session: ClientSession, snippets: dict[str, str]) -> dict:
+    """Run several Luau snippets in a single execute_script call.
+
+    Each snippet is a function body that ``return``s its value; the result
+    maps every key (a Luau identifier) to that value, unwrapped.
+    """
+    fields = ",\n".join(
+        f"{key} = (function()\n{body}\nend)()" for key, body in snippets.items()
+    )
+    parsed = await exec_script(session, f"return {{\n{fields}\n}}")
+    return {key: _unwrap_value(value) for key, value in parsed["result"].items()}
+
+
+def _unwrap_value(r):
+    if isinstance(r, dict) and "result" in r:
+        return r["result"]
+    return r
 
 
 def unwrap(parsed):
@@ -17,7 +48,4 @@ def unwrap(parsed):
     MCP tools using structured_content return {"result": value} as a table.
     Plain text results return strings directly.
     """
-    r = parsed["result"]
-    if isinstance(r, dict) and "result" in r:
-        return r["result"]
-    return r
+    return _unwrap_value(parsed["result"])
@@ -1,15 +1,8 @@
-import json
-import pytest
 from mcp import ClientSession
 
-
-def parse_result(result) -> dict:
-    text = result.content[0].text
-    assert not result.isError, f"Script execution error: {text}"
-    return json.loads(text)
+from helpers import parse_result
 
 
-@pytest.mark.asyncio
 async def test_no_auth_read_succeeds(mcp_no_auth_session: ClientSession):
     """Public endpoints work without any credentials."""
     result = await mcp_no_auth_session.call_tool("execute_script", {
@@ -20,7 +13,6 @@ async def test_no_auth_read_succeeds(mcp_no_auth_session: ClientSession):
     assert data["result"]["total"] == 4
 
 
-@pytest.mark.asyncio
 async def test_no_auth_write_fails(mcp_no_auth_session: ClientSession):
     """Protected endpoints fail without credentials."""
     result = await mcp_no_auth_session.call_tool("execute_script", {
@@ -31,7 +23,6 @@ async def test_no_auth_write_fails(mcp_no_auth_session: ClientSession):
     assert "401" in text or "error" in text.lower() or "Unauthorized" in text
 
 
-@pytest.mark.asyncio
 async def test_bearer_token_auth(mcp_stdio_session: ClientSession):
     """Env-var bearer token allows mutations (uses main session with creds)."""
     result = await mcp_stdio_session.call_tool("execute_script", {
@@ -41,7 +32,6 @@ async def test_bearer_token_auth(mcp_stdio_session: ClientSession):
     assert data["result"]["name"] == "Bearer"
 
 
-@pytest.mark.asyncio
 async def test_meta_auth_override(mcp_no_auth_session: ClientSession):
     """Passing _meta.auth with bearer token allows mutation on no-auth session."""
     # The Python MCP SDK's call_tool() accepts a `meta` keyword arg which maps
@@ -1,17 +1,12 @@
-import json
-
 import httpx
 import pytest
 from mcp import ClientSession
 
+from helpers import parse_result
 
-def parse_result(result) -> dict:
-    text = result.content[0].text
-    assert not result.isError, f"Script execution error: {text}"
-    return json.loads(text)
+pytestmark = pytest.mark.readonly
 
 
-@pytest.mark.asyncio
 async def test_http_list_tools(mcp_http_session: ClientSession):
     result = await mcp_http_session.list_tools()
     tool_names = {t.name for t in result.tools}
@@ -19,7 +14,6 @@ async def test_http_list_tools(mcp_http_session: ClientSession):
     assert "list_apis" in tool_names
 
 
-@pytest.mark.asyncio
 async def test_http_execute_script(mcp_http_session: ClientSession):
     result = await mcp_http_session.call_tool("execute_script", {
         "script": "return sdk.list_pets()"
@@ -28,7 +22,6 @@ async def test_http_execute_script(mcp_http_session: ClientSession):
     assert data["result"]["total"] == 4
 
 
-@pytest.mark.asyncio
 async def test_http_auth_required(mcp_http_url: str):
     """Request to /mcp without JWT should be rejected."""
     async with httpx.AsyncClient() as client:
@@ -44,7 +37,6 @@ async def test_http_auth_required(mcp_http_url: str):
     assert resp.status_code == 401
 
 
-@pytest.mark.asyncio
 async def test_http_well_known(mcp_http_url: str):
     """Well-known endpoint returns OAuth metadata (accessible without auth)."""
     async with httpx.AsyncClient() as client:
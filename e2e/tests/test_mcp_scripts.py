@@ -4,80 +4,54 @@ Verify that Luau scripts can call MCP tools via sdk.mock.<tool>() and
 handle various parameter types, return values, and error conditions.
 """
 
-import json
-
 import pytest
+import pytest_asyncio
 from mcp import ClientSession
 
-from helpers import exec_script as _exec, unwrap as _unwrap
-
-
-@pytest.mark.asyncio
-async def test_echo_tool(mcp_only_session: ClientSession):
-    """sdk.mock.echo returns the input text."""
-    parsed = await _exec(
-        mcp_only_session,
-        'return sdk.mock.echo({ text = "hello" })',
-    )
-    assert _unwrap(parsed) == "hello"
-
+from helpers import exec_batch as _exec_batch, exec_script as _exec, unwrap as _unwrap
+
+pytestmark = pytest.mark.readonly
+
+
+# (key, script, check on the unwrapped result)
+MOCK_CASES = [
+    # Plain string and number results
+    ("echo", 'return sdk.mock.echo({ text = "hello" })', lambda r: r == "hello"),
+    ("add", "return sdk.mock.add({ a = 2, b = 3 })", lambda r: r == 5),
+    ("no_params", "return sdk.mock.no_params()", lambda r: r == "ok"),
+    # Object results, with and without the optional param. get_user has no
+    # output schema, so its JSON text is decoded in the script.
+    ("get_user", 'return json.decode(sdk.mock.get_user({ user_id = "u1" }))',
+     lambda r: r.get("name") == "Alice"),
+    ("get_user_email",
+     'return json.decode(sdk.mock.get_user({ user_id = "u1", include_email = true }))',
+     lambda r: "email" in r),
+    # List results
+    ("list_items", 'return sdk.mock.list_items({ category = "books" })',
+     lambda r: isinstance(r, list) and len(r) == 3 and r[0]["name"] == "books-0"),
+    # sdk.mock is a table with function members
+    ("table_structure", 'return type(sdk.mock) .. ":" .. type(sdk.mock.echo)',
+     lambda r: r == "table:function"),
+]
+
+
+@pytest_asyncio.fixture(loop_scope="session", scope="module")
+async def mock_results(mcp_only_session: ClientSession) -> dict:
+    """Results of every MOCK_CASES script, from one execute_script round-trip."""
+    return await _exec_batch(mcp_only_session, {key: script for key, script, _ in MOCK_CASES})
+
+
+@pytest.mark.parametrize(
+    "key, check",
+    [(key, check) for key, _, check in MOCK_CASES],
+    ids=[key for key, _, _ in MOCK_CASES],
+)
+async def test_sdk_mock_call(mock_results: dict, key: str, check):
+    """sdk.mock.<tool> handles each parameter and return shape."""
+    result = mock_results[key]
+    assert check(result), f"{key}: unexpected result {result!r}"
 
-@pytest.mark.asyncio
-async def test_add_tool(mcp_only_session: ClientSession):
-    """sdk.mock.add returns the sum."""
-    parsed = await _exec(
-        mcp_only_session,
-        "return sdk.mock.add({ a = 2, b = 3 })",
-    )
-    assert _unwrap(parsed) == 5
 
-
-@pytest.mark.asyncio
-async def test_get_user_basic(mcp_only_session: ClientSession):
-    """sdk.mock.get_user returns user data with name."""
-    parsed = await _exec(
-        mcp_only_session,
-        'return sdk.mock.get_user({ user_id = "u1" })',
-    )
-    result_str = json.dumps(_unwrap(parsed))
-    assert "Alice" in result_str
-
-
-@pytest.mark.asyncio
-async def test_get_user_optional_param(mcp_only_session: ClientSession):
-    """sdk.mock.get_user with include_email=true includes email."""
-    parsed = await _exec(
-        mcp_only_session,
-        'return sdk.mock.get_user({ user_id = "u1", include_email = true })',
-    )
-    result_str = json.dumps(_unwrap(parsed))
-    assert "email" in result_str
-
-
-@pytest.mark.asyncio
-async def test_list_items(mcp_only_session: ClientSession):
-    """sdk.mock.list_items returns items."""
-    parsed = await _exec(
-        mcp_only_session,
-        'return sdk.mock.list_items({ category = "books" })',
-    )
-    items = _unwrap(parsed)
-    assert isinstance(items, list)
-    assert len(items) == 3
-    assert items[0]["name"] == "books-0"
-
-
-@pytest.mark.asyncio
-async def test_no_params_tool(mcp_only_session: ClientSession):
-    """sdk.mock.no_params() works with no arguments."""
-    parsed = await _exec(
-        mcp_only_session,
-        "return sdk.mock.no_params()",
-    )
-    assert _unwrap(parsed) == "ok"
-
-
-@pytest.mark.asyncio
 async def test_failing_tool_error(mcp_only_session: ClientSession):
     """pcall on sdk.mock.failing_tool captures the error."""
     parsed = await _exec(
@@ -94,18 +68,6 @@ return "unexpected success"
     assert "caught" in result
 
 
-@pytest.mark.asyncio
-async def test_sdk_table_structure(mcp_only_session: ClientSession):
-    """sdk.mock is a table with function members."""
-    parsed = await _exec(
-        mcp_only_session,
-        'return type(sdk.mock) .. ":" .. type(sdk.mock.echo)',
-    )
-    result = _unwrap(parsed)
-    assert result == "table:function"
-
-
-@pytest.mark.asyncio
 async def test_multi_tool_chain(mcp_only_session: ClientSession):
     """Chain multiple MCP tool calls in a single script."""
     parsed = await _exec(
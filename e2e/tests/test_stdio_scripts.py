@@ -1,20 +1,26 @@
-import json
+import asyncio
+import operator
+
 import pytest
 from mcp import ClientSession
 
+from helpers import parse_result
 
-def parse_result(result) -> dict:
-    """Parse a successful execute_script response.
+# Client-side bound for scripts run on mcp_limited_session; well above its
+# --timeout 2 so it only fires if the server-side limits are broken.
+CLIENT_TIMEOUT = 5.0
 
-    Returns the parsed JSON containing 'result', 'logs', and 'stats'.
-    Raises AssertionError if the response indicates an error.
-    """
-    text = result.content[0].text
-    assert not result.isError, f"Script execution error: {text}"
-    return json.loads(text)
+
+async def _exec_limited(session: ClientSession, script: str):
+    try:
+        return await asyncio.wait_for(
+            session.call_tool("execute_script", {"script": script}),
+            timeout=CLIENT_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        pytest.fail(f"No response within {CLIENT_TIMEOUT}s; mcp_limited_session's limits did not stop the script")
 
 
-@pytest.mark.asyncio
 async def test_list_pets_smoke(mcp_stdio_session: ClientSession):
     """Smoke test: verify response format from execute_script."""
     result = await mcp_stdio_session.call_tool("execute_script", {
@@ -25,7 +31,6 @@ async def test_list_pets_smoke(mcp_stdio_session: ClientSession):
     assert "logs" in data
 
 
-@pytest.mark.asyncio
 async def test_list_pets(mcp_stdio_session: ClientSession):
     """sdk.list_pets() should return seeded data with items and total."""
     result = await mcp_stdio_session.call_tool("execute_script", {
@@ -35,14 +40,13 @@ async def test_list_pets(mcp_stdio_session: ClientSession):
     pets = data["result"]
     assert pets["total"] == 4
     assert len(pets["items"]) == 4
-    names = {p["name"] for p in pets["items"]}
+    names = set(map(operator.itemgetter("name"), pets["items"]))
     assert "Fido" in names
     assert "Whiskers" in names
     assert "Buddy" in names
     assert "Luna" in names
 
 
-@pytest.mark.asyncio
 async def test_get_pet_by_id(mcp_stdio_session: ClientSession):
     """sdk.get_pet({ pet_id = 1 }) should return Fido."""
     result = await mcp_stdio_session.call_tool("execute_script", {
@@ -57,7 +61,6 @@ async def test_get_pet_by_id(mcp_stdio_session: ClientSession):
     assert pet["owner_id"] == 1
 
 
-@pytest.mark.asyncio
 async def test_create_pet(mcp_stdio_session: ClientSession):
     """sdk.create_pet({...}) should create a new pet and return it."""
     result = await mcp_stdio_session.call_tool("execute_script", {
@@ -71,7 +74,6 @@ async def test_create_pet(mcp_stdio_session: ClientSession):
     assert "id" in pet
 
 
-@pytest.mark.asyncio
 async def test_update_pet(mcp_stdio_session: ClientSession):
     """sdk.update_pet({ pet_id = 1 }, body) should update and return the pet."""
     result = await mcp_stdio_session.call_tool("execute_script", {
@@ -83,7 +85,6 @@ async def test_update_pet(mcp_stdio_session: ClientSession):
     assert pet["name"] == "Fido Jr."
 
 
-@pytest.mark.asyncio
 async def test_delete_pet(mcp_stdio_session: ClientSession):
     """sdk.delete_pet({ pet_id = 1 }) should delete the pet."""
     result = await mcp_stdio_session.call_tool("execute_script", {
@@ -93,7 +94,6 @@ async def test_delete_pet(mcp_stdio_session: ClientSession):
     assert data["result"]["status"] == "deleted"
 
 
-@pytest.mark.asyncio
 async def test_query_params(mcp_stdio_session: ClientSession):
     """sdk.list_pets({ limit = 2, status = "active" }) should filter by query params."""
     result = await mcp_stdio_session.call_tool("execute_script", {
@@ -107,7 +107,6 @@ async def test_query_params(mcp_stdio_session: ClientSession):
         assert p["status"] == "active"
 
 
-@pytest.mark.asyncio
 async def test_nested_resource(mcp_stdio_session: ClientSession):
     """sdk.list_owner_pets({ owner_id = 1 }) should return pets for a specific owner."""
     result = await mcp_stdio_session.call_tool("execute_script", {
@@ -122,7 +121,6 @@ async def test_nested_resource(mcp_stdio_session: ClientSession):
     assert "Whiskers" in names
 
 
-@pytest.mark.asyncio
 async def test_multi_call_script(mcp_stdio_session: ClientSession):
     """Chain: list_pets -> get first pet by ID from result."""
     script = """
@@ -142,7 +140,6 @@ async def test_multi_call_script(mcp_stdio_session: ClientSession):
     assert r["detail"]["name"] is not None
 
 
-@pytest.mark.asyncio
 async def test_create_then_fetch(mcp_stdio_session: ClientSession):
     """Chain: create pet -> fetch it by returned ID."""
     script = """
@@ -160,7 +157,6 @@ async def test_create_then_fetch(mcp_stdio_session: ClientSession):
     assert r["created"]["id"] == r["fetched"]["id"]
 
 
-@pytest.mark.asyncio
 async def test_enum_values(mcp_stdio_session: ClientSession):
     """sdk.list_pets({ status = "pending" }) -> all returned pets should have status "pending"."""
     result = await mcp_stdio_session.call_tool("execute_script", {
@@ -173,7 +169,6 @@ async def test_enum_values(mcp_stdio_session: ClientSession):
         assert p["status"] == "pending"
 
 
-@pytest.mark.asyncio
 async def test_optional_fields(mcp_stdio_session: ClientSession):
     """sdk.get_pet({ pet_id = 4 }) -> Luna has no owner_id (should be null)."""
     result = await mcp_stdio_session.call_tool("execute_script", {
@@ -185,7 +180,6 @@ async def test_optional_fields(mcp_stdio_session: ClientSession):
     assert pet["owner_id"] is None
 
 
-@pytest.mark.asyncio
 async def test_script_error_handling(mcp_stdio_session: ClientSession):
     """sdk.get_pet({ pet_id = 9999 }) -> should get a 404 error, not crash."""
     result = await mcp_stdio_session.call_tool("execute_script", {
@@ -197,34 +191,27 @@ async def test_script_error_handling(mcp_stdio_session: ClientSession):
     assert "404" in text or "not found" in text.lower() or "error" in text.lower()
 
 
-@pytest.mark.asyncio
 async def test_script_timeout(mcp_limited_session: ClientSession):
     """An infinite loop is killed after the timeout."""
-    result = await mcp_limited_session.call_tool("execute_script", {
-        "script": "while true do end"
-    })
+    result = await _exec_limited(mcp_limited_session, "while true do end")
     assert result.isError is True
     text = result.content[0].text
     assert "timeout" in text.lower() or "time" in text.lower() or "interrupt" in text.lower()
 
 
-@pytest.mark.asyncio
 async def test_max_api_calls_exceeded(mcp_limited_session: ClientSession):
     """Script making more than 3 API calls is stopped."""
-    result = await mcp_limited_session.call_tool("execute_script", {
-        "script": """
-            for i = 1, 10 do
-                sdk.list_pets()
-            end
-            return "should not reach here"
-        """
-    })
+    result = await _exec_limited(mcp_limited_session, """
+        for i = 1, 10 do
+            sdk.list_pets()
+        end
+        return "should not reach here"
+    """)
     assert result.isError is True
     text = result.content[0].text
     assert "api" in text.lower() or "limit" in text.lower() or "exceeded" in text.lower() or "call" in text.lower()
 
 
-@pytest.mark.asyncio
 async def test_sandbox_no_file_io(mcp_stdio_session: ClientSession):
     """io.open() is blocked by the Luau sandbox."""
     result = await mcp_stdio_session.call_tool("execute_script", {
@@ -235,19 +222,18 @@ async def test_sandbox_no_file_io(mcp_stdio_session: ClientSession):
     assert "error" in text.lower() or "nil" in text.lower() or "attempt to index" in text.lower() or "io" in text.lower()
 
 
-@pytest.mark.asyncio
 async def test_io_write_to_disk(mcp_io_session):
     """io.open/write/close should write a file and report it in files_touched."""
     session, io_dir = mcp_io_session
     result = await session.call_tool("execute_script", {
         "script": '''
             local pets = sdk.list_pets()
-            local csv = "id,name\\n"
+            local rows = { "id,name" }
             for _, p in ipairs(pets.items) do
-                csv = csv .. p.id .. "," .. p.name .. "\\n"
+                rows[#rows + 1] = p.id .. "," .. p.name
             end
             local f = io.open("pets.csv", "w")
-            f:write(csv)
+            f:write(table.concat(rows, "\\n") .. "\\n")
             f:close()
             return { saved = true, count = #pets.items }
         '''
@@ -270,7 +256,6 @@ async def test_io_write_to_disk(mcp_io_session):
     assert "Whiskers" in content
 
 
-@pytest.mark.asyncio
 async def test_io_rejects_traversal(mcp_io_session):
     """io.open() should reject path traversal attempts."""
     session, _ = mcp_io_session
@@ -1,8 +1,9 @@
 import pytest
 from mcp import ClientSession
 
+pytestmark = pytest.mark.readonly
+
 
-@pytest.mark.asyncio
 async def test_list_tools(mcp_stdio_session: ClientSession):
     """Verify that the MCP server exposes the expected tools."""
     result = await mcp_stdio_session.list_tools()
@@ -14,14 +15,12 @@ async def test_list_tools(mcp_stdio_session: ClientSession):
     assert "execute_script" in tool_names
 
 
-@pytest.mark.asyncio
 async def test_list_apis(mcp_stdio_session: ClientSession):
     result = await mcp_stdio_session.call_tool("list_apis", {})
     text = result.content[0].text
     assert "test_api" in text
 
 
-@pytest.mark.asyncio
 async def test_list_functions(mcp_stdio_session: ClientSession):
     result = await mcp_stdio_session.call_tool("list_functions", {})
     text = result.content[0].text
@@ -30,21 +29,18 @@ async def test_list_functions(mcp_stdio_session: ClientSession):
     assert "get_pet" in text
 
 
-@pytest.mark.asyncio
 async def test_list_functions_filter_by_tag(mcp_stdio_session: ClientSession):
     result = await mcp_stdio_session.call_tool("list_functions", {"tag": "pets"})
     text = result.content[0].text
     assert "list_pets" in text
 
 
-@pytest.mark.asyncio
 async def test_get_function_docs(mcp_stdio_session: ClientSession):
     result = await mcp_stdio_session.call_tool("get_function_docs", {"name": "list_pets"})
     text = result.content[0].text
     assert "list_pets" in text
 
 
-@pytest.mark.asyncio
 async def test_search_docs(mcp_stdio_session: ClientSession):
     result = await mcp_stdio_session.call_tool("search_docs", {"query": "pet"})
     text = result.content[0].text
@@ -29,6 +29,10 @@ pub struct ToolScriptServer {
     pub executor: ScriptExecutor,
     /// Pre-rendered function annotations indexed by function name.
     pub annotation_cache: HashMap<String, String>,
+    /// Pre-rendered `list_apis` response.
+    pub list_apis_cache: String,
+    /// Pre-rendered unfiltered `list_functions` response.
+    pub list_functions_cache: String,
     /// Authentication credentials loaded from environment.
     pub auth: AuthCredentialsMap,
     /// Whether I/O operations are enabled (sandboxed file access).
@@ -66,6 +70,10 @@ impl ToolScriptServer {
             annotation_cache.insert(builtin.name.to_string(), builtin.annotation.to_string());
         }
 
+        // Pre-render the unfiltered discovery listings
+        let list_apis_cache = tools::render_list_apis(&manifest, io_enabled);
+        let list_functions_cache = tools::render_list_functions(&manifest, io_enabled, None, None);
+
         let executor =
             ScriptExecutor::new(manifest.clone(), handler, config, io_config, mcp_client);
 
@@ -73,6 +81,8 @@ impl ToolScriptServer {
             manifest,
             executor,
             annotation_cache,
+            list_apis_cache,
+            list_functions_cache,
             auth,
             io_enabled,
         }
@@ -388,6 +398,34 @@ mod tests {
         assert_eq!(create["deprecated"], true);
     }
 
+    #[test]
+    fn test_list_caches_include_io_builtins() {
+        let output_dir = tempfile::tempdir().unwrap();
+        let server = ToolScriptServer::new(
+            test_manifest(),
+            Arc::new(HttpHandler::mock(|_, _, _, _| Ok(serde_json::json!({})))),
+            AuthCredentialsMap::new(),
+            ExecutorConfig::default(),
+            Some(crate::runtime::executor::IoConfig {
+                dir: output_dir.path().to_path_buf(),
+                max_bytes: 50 * 1024 * 1024,
+            }),
+            Arc::new(McpClientManager::empty()),
+        );
+
+        let result = tools::list_apis_impl(&server);
+        let json: serde_json::Value = serde_json::from_str(&result).unwrap();
+        let apis = json.as_array().unwrap();
+        let luau_entry = apis.iter().find(|a| a["name"] == "luau").unwrap();
+        assert_eq!(luau_entry["function_count"], 9); // 4 base + 5 io
+
+        let result = tools::list_functions_impl(&server, None, None);
+        let json: serde_json::Value = serde_json::from_str(&result).unwrap();
+        let funcs = json.as_array().unwrap();
+        assert_eq!(funcs.len(), 13); // 3 OpenAPI + 1 MCP + 9 builtins
+        assert!(funcs.iter().any(|f| f["name"] == "io.open"));
+    }
+
     #[test]
     fn test_list_functions_filtered_by_tag() {
         let server = test_server();
@@ -10,6 +10,7 @@ use serde::Deserialize;
 use super::ToolScriptServer;
 use super::auth;
 use super::builtins;
+use crate::codegen::manifest::Manifest;
 use crate::runtime::http::AuthCredentialsMap;
 
 // ---- Tool parameter structs ----
@@ -39,14 +40,21 @@ struct ExecuteScriptParams {
 // ---- Tool implementations (pure logic, testable without MCP protocol) ----
 
 /// Implementation for `list_apis`: returns JSON array of API summaries.
+///
+/// The listing only depends on the manifest and the io flag (which sets the
+/// luau builtin count), so it is rendered once when the server is built and
+/// served from `list_apis_cache`.
 pub fn list_apis_impl(server: &ToolScriptServer) -> String {
-    let mut apis: Vec<serde_json::Value> = server
-        .manifest
+    server.list_apis_cache.clone()
+}
+
+/// Render the `list_apis` JSON for a manifest.
+pub(super) fn render_list_apis(manifest: &Manifest, io_enabled: bool) -> String {
+    let mut apis: Vec<serde_json::Value> = manifest
         .apis
         .iter()
         .map(|api| {
-            let function_count = server
-                .manifest
+            let function_count = manifest
                 .functions
                 .iter()
                 .filter(|f| f.api == api.name)
@@ -62,7 +70,7 @@ pub fn list_apis_impl(server: &ToolScriptServer) -> String {
         .collect();
 
     // Append MCP servers
-    for mcp_server in &server.manifest.mcp_servers {
+    for mcp_server in &manifest.mcp_servers {
         apis.push(serde_json::json!({
             "name": mcp_server.name,
             "description": mcp_server.description,
@@ -72,7 +80,7 @@ pub fn list_apis_impl(server: &ToolScriptServer) -> String {
     }
 
     // Append built-in Luau globals
-    let builtin_count = builtins::builtin_functions(server.io_enabled).count();
+    let builtin_count = builtins::builtin_functions(io_enabled).count();
     apis.push(serde_json::json!({
         "name": "luau",
         "description": builtins::LUAU_DESCRIPTION,
@@ -84,13 +92,28 @@ pub fn list_apis_impl(server: &ToolScriptServer) -> String {
 }
 
 /// Implementation for `list_functions`: returns JSON array of function summaries.
+///
+/// The unfiltered listing is the common case and is served from
+/// `list_functions_cache`; filtered listings are rendered per call.
 pub fn list_functions_impl(
     server: &ToolScriptServer,
     api: Option<&str>,
     tag: Option<&str>,
 ) -> String {
-    let mut funcs: Vec<serde_json::Value> = server
-        .manifest
+    if api.is_none() && tag.is_none() {
+        return server.list_functions_cache.clone();
+    }
+    render_list_functions(&server.manifest, server.io_enabled, api, tag)
+}
+
+/// Render the `list_functions` JSON for a manifest, optionally filtered.
+pub(super) fn render_list_functions(
+    manifest: &Manifest,
+    io_enabled: bool,
+    api: Option<&str>,
+    tag: Option<&str>,
+) -> String {
+    let mut funcs: Vec<serde_json::Value> = manifest
         .functions
         .iter()
         .filter(|f| {
@@ -114,7 +137,7 @@ pub fn list_functions_impl(
 
     // Append MCP tools (skip when filtering by tag, since MCP tools have no tags)
     if tag.is_none() {
-        for mcp_server in &server.manifest.mcp_servers {
+        for mcp_server in &manifest.mcp_servers {
             if let Some(api_filter) = api
                 && mcp_server.name != api_filter
             {
@@ -134,7 +157,7 @@ pub fn list_functions_impl(
 
     // Append built-in Luau globals (skip when filtering by tag, since builtins have no tags)
     if tag.is_none() {
-        for builtin in builtins::builtin_functions(server.io_enabled) {
+        for builtin in builtins::builtin_functions(io_enabled) {
             if let Some(api_filter) = api
                 && api_filter != "luau"
             {